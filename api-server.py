@@ -5,13 +5,154 @@ This server handles both static files and API requests for team management.
 """
 
 import http.server
-import socketserver
 import sys
 import os
 import json
+import gzip
+import time
 import signal
+import select
+import threading
 import subprocess
-from urllib.parse import unquote, parse_qs, urlparse
+import collections
+import hashlib
+import tempfile
+import concurrent.futures
+from stat import S_ISREG
+from urllib.parse import unquote, parse_qs
+
+from server_common import CORS_HEADERS, LOG_TIME_FORMAT, ReuseAddrTCPServer
+
+# Prefer orjson for (de)serialization when available - it is several times
+# faster than the stdlib on large entity/relation payloads and produces bytes
+# directly, so responses skip an extra encode step
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(data):
+        return json.dumps(data).encode()
+    _loads = json.loads
+
+# zstd is offered to clients that accept it when zstandard is installed;
+# gzip from the stdlib is used otherwise
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# psutil is optional; without it /health reports zero CPU and memory usage
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Paths are resolved once at import time rather than on every request. The
+# visualizer lives in <coding>/integrations/memory-visualizer.
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_CODING_PATH = os.path.dirname(os.path.dirname(_HERE))
+_CODING_PATH_PREFIX = os.path.join(_CODING_PATH, '')
+_CODING_PATH_REAL_PREFIX = os.path.join(os.path.realpath(_CODING_PATH), '')
+_QUERY_SCRIPT = os.path.join(_CODING_PATH, 'lib', 'vkb-server', 'db-query-cli.js')
+_VKB_CLI = os.path.join(_CODING_PATH, 'bin', 'vkb-cli.js')
+_KNOWLEDGE_EXPORT_DIR = os.path.join(_CODING_PATH, '.data', 'knowledge-export')
+_DIST_MEMORY_JSON = os.path.join(_HERE, 'dist', 'memory.json')
+# /health reports on the same export directory the Node.js tools use unless
+# CODING_KB_PATH points elsewhere
+_DEFAULT_KB_PATH = _CODING_PATH
+# The Node.js scripts are checked for once rather than stat'ed per request
+_QUERY_SCRIPT_AVAILABLE = os.path.exists(_QUERY_SCRIPT)
+_VKB_CLI_AVAILABLE = os.path.exists(_VKB_CLI)
+
+# Environment for the Node.js child processes, built once instead of copying
+# os.environ per request. It is replaced rather than mutated when the teams
+# change, so a request always passes a consistent snapshot.
+_CHILD_ENV = dict(os.environ, KNOWLEDGE_EXPORT_DIR=_KNOWLEDGE_EXPORT_DIR)
+_CHILD_ENV_LOCK = threading.Lock()
+
+# LRU cache of successful database query responses. Entries are keyed on the
+# query and the active KNOWLEDGE_VIEW and expire after _QCACHE_TTL seconds, so
+# repeated UI polls do not fork a Node.js process for every request. Each
+# entry is (timestamp, body, compressed bodies by Content-Encoding). Besides
+# the entry count, the cache is bounded by the total size of the bodies; the
+# compressed copies are a fraction of that and not counted.
+_QCACHE = collections.OrderedDict()
+_QCACHE_MAX = 256
+_QCACHE_MAX_BYTES = 64 * 1024 * 1024
+_QCACHE_BYTES = 0
+# Larger responses are not cached at all so one of them cannot evict the rest
+_QCACHE_MAX_ENTRY = 8 * 1024 * 1024
+_QCACHE_TTL = 30.0
+_QCACHE_LOCK = threading.Lock()
+
+# Last /api/available-teams response and its ETag. The team list changes
+# rarely, so UI polls within the TTL are answered without querying GraphDB
+# and revalidations with a matching If-None-Match get an empty 304. The entry
+# is also dropped as soon as the knowledge export files change.
+_TEAMS_CACHE = {'etag': None, 'body': None, 'compressed': None, 'ts': 0.0, 'signature': None}
+_TEAMS_CACHE_TTL = 15.0
+_TEAMS_CACHE_LOCK = threading.Lock()
+
+# Strips the braces from KNOWLEDGE_VIEW values like '{coding,ui}'
+_BRACE_TABLE = str.maketrans('', '', '{}')
+
+# First bytes of the logging/status lines the Node.js CLI prints around its
+# JSON output, as a set of ints for O(1) lookups on indexed bytes. '✓' and
+# '⚠' both start with 0xE2 in UTF-8.
+_LOG_LINE_PREFIXES = frozenset(b'\xe2[ ')
+_WHITESPACE_BYTES = frozenset(b' \t\r\n\x0b\x0c')
+
+# Most recent data regeneration started by POST /api/teams. The request
+# returns as soon as vkb-cli.js is started; /api/regen-status reports progress.
+_REGEN_JOB = None
+_REGEN_TIMEOUT = 30
+_REGEN_LOCK = threading.Lock()
+
+# Database queries currently running, keyed on query type, parameters and
+# KNOWLEDGE_VIEW. Identical concurrent queries wait for the running one
+# instead of starting their own.
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+# System usage reported by /health, refreshed by a background thread so
+# health polls never call into psutil themselves
+_SYSTEM_STATS = {'cpu_percent': 0, 'memory_percent': 0}
+_SYSTEM_STATS_INTERVAL = 2.0
+
+# Knowledge export files listed by /health, cached for a few seconds so
+# frequent polls do not rescan the directory
+_KB_FILES_CACHE = {'path': None, 'files': None, 'error': None, 'ts': 0.0}
+_KB_FILES_CACHE_TTL = 5.0
+_KB_FILES_CACHE_LOCK = threading.Lock()
+
+# Content types of the knowledge-management files, by extension
+_CONTENT_TYPES = {
+    '.md': 'text/markdown; charset=utf-8',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.svg': 'image/svg+xml',
+    '.json': 'application/json',
+    '.puml': 'text/plain; charset=utf-8',
+}
+
+# Responses smaller than this are not worth compressing, and files larger
+# than _COMPRESS_MAX_SIZE are streamed uncompressed rather than read into
+# memory
+_COMPRESS_MIN_SIZE = 512
+_COMPRESS_MAX_SIZE = 16 * 1024 * 1024
+_COMPRESSIBLE_TYPES = ('text/', 'application/json', 'image/svg+xml')
+
+# ZstdCompressor instances must not be shared between threads
+_zstd_local = threading.local()
+
+# Files smaller than this are read and written directly; larger ones are
+# handed to the kernel with sendfile() instead of being copied through Python
+_SENDFILE_MIN_SIZE = 16 * 1024
+
+# Largest request body accepted; POST /api/teams only carries a team list
+_MAX_REQUEST_BODY = 64 * 1024
 
 # Ignore SIGHUP to prevent termination when parent terminal closes
 # This allows the server to run as a proper daemon
@@ -20,56 +161,333 @@ if hasattr(signal, 'SIGHUP'):
     signal.signal(signal.SIGHUP, signal.SIG_IGN)
 
 
+def _find_json_line(output):
+    """Return the first line of CLI output that is not a logging/status line.
+
+    The output is raw bytes and line starts are scanned in place, so large
+    outputs are never decoded or split into a list of lines.
+    """
+    end = len(output)
+    start = 0
+    while start < end and output[start] in _WHITESPACE_BYTES:
+        start += 1
+
+    while start < end:
+        newline = output.find(b'\n', start)
+        if newline == -1:
+            newline = end
+        if newline > start and output[start] not in _LOG_LINE_PREFIXES:
+            return output[start:newline]
+        start = newline + 1
+    return None
+
+
+def _zstd_compress(data):
+    """Compress data with this thread's cached ZstdCompressor."""
+    compressor = getattr(_zstd_local, 'compressor', None)
+    if compressor is None:
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=3)
+    return compressor.compress(data)
+
+
+def _compress(data, encoding):
+    """Compress data with the given Content-Encoding, 'zstd' or 'gzip'."""
+    if encoding == 'zstd':
+        return _zstd_compress(data)
+    # Level 1: responses are mostly repetitive JSON, where higher levels cost
+    # far more CPU for little size gain
+    return gzip.compress(data, compresslevel=1)
+
+
+def _qcache_put(key, body, compressed):
+    """Cache a query response, evicting the least recently used entries.
+
+    Call with _QCACHE_LOCK held.
+    """
+    global _QCACHE_BYTES
+    old = _QCACHE.pop(key, None)
+    if old is not None:
+        _QCACHE_BYTES -= len(old[1])
+    _QCACHE[key] = (time.monotonic(), body, compressed)
+    _QCACHE_BYTES += len(body)
+    while len(_QCACHE) > _QCACHE_MAX or _QCACHE_BYTES > _QCACHE_MAX_BYTES:
+        _QCACHE_BYTES -= len(_QCACHE.popitem(last=False)[1][1])
+
+
+def _sample_system_stats():
+    """Keep _SYSTEM_STATS up to date; runs forever on a daemon thread."""
+    while True:
+        _SYSTEM_STATS['memory_percent'] = psutil.virtual_memory().percent
+        # Blocks for the interval and returns the average usage over it
+        _SYSTEM_STATS['cpu_percent'] = psutil.cpu_percent(interval=_SYSTEM_STATS_INTERVAL)
+
+
+def _start_regen_job(teams_str, env):
+    """Start vkb-cli.js regenerating memory.json and return the job record."""
+    # Trigger data regeneration by deleting memory.json
+    try:
+        os.unlink(_DIST_MEMORY_JSON)
+    except FileNotFoundError:
+        pass
+
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(
+            ['node', _VKB_CLI, 'data', 'process'],
+            stdout=subprocess.DEVNULL,
+            stderr=stderr_file,
+            env=env,
+            cwd=_CODING_PATH
+        )
+    except Exception:
+        stderr_file.close()
+        raise
+
+    job = {
+        'proc': proc,
+        'stderr': stderr_file,
+        'teams': teams_str,
+        'started': time.time(),
+        'status': 'regenerating'
+    }
+    threading.Thread(target=_watch_regen_job, args=(job,), daemon=True).start()
+    return job
+
+
+def _watch_regen_job(job):
+    """Wait for a data regeneration process and record how it ended."""
+    proc, stderr_file = job['proc'], job['stderr']
+    try:
+        returncode = proc.wait(timeout=_REGEN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        returncode = proc.wait()
+        error = f'Data processing timed out after {_REGEN_TIMEOUT} seconds'
+    else:
+        stderr_file.seek(0)
+        error_msg = stderr_file.read().decode(errors='replace').strip() or 'Unknown error'
+        error = f'Data processing failed: {error_msg}'
+    finally:
+        stderr_file.close()
+
+    with _REGEN_LOCK:
+        job['returncode'] = returncode
+        if returncode == 0:
+            job['status'] = 'done'
+        elif job['status'] == 'cancelled':
+            pass
+        else:
+            job['status'] = 'failed'
+            job['error'] = error
+            print(f"VKB CLI error (code {returncode}): {error}", file=sys.stderr)
+
+
+def _export_dir_signature():
+    """Return the names, mtimes and sizes of the knowledge export files.
+
+    One scandir pass; used to notice new or updated exports without
+    querying GraphDB. Only the JSON exports are considered, so temporary and
+    lock files written next to them do not invalidate the team list. Returns
+    None if the directory cannot be read.
+    """
+    try:
+        with os.scandir(_KNOWLEDGE_EXPORT_DIR) as entries:
+            signature = []
+            for entry in entries:
+                # The name is checked first as it needs no system call
+                if entry.name.endswith('.json') and entry.is_file():
+                    stat = entry.stat()
+                    signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    except OSError:
+        return None
+    signature.sort()
+    return tuple(signature)
+
+
+def _get_kb_files(export_path):
+    """Return the JSON files in the knowledge export directory and any error."""
+    with _KB_FILES_CACHE_LOCK:
+        if (_KB_FILES_CACHE['path'] == export_path
+                and time.monotonic() - _KB_FILES_CACHE['ts'] < _KB_FILES_CACHE_TTL):
+            return _KB_FILES_CACHE['files'], _KB_FILES_CACHE['error']
+
+    kb_files = []
+    error = None
+    try:
+        # scandir entries carry their file type, so each file costs one stat
+        with os.scandir(export_path) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    stat = entry.stat()
+                    kb_files.append({
+                        'name': entry.name,
+                        'size': stat.st_size,
+                        'last_modified': stat.st_mtime
+                    })
+    except Exception as e:
+        error = str(e)
+
+    with _KB_FILES_CACHE_LOCK:
+        _KB_FILES_CACHE.update(path=export_path, files=kb_files, error=error, ts=time.monotonic())
+    return kb_files, error
+
+
 class APIHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """HTTP request handler with CORS support and API endpoints."""
+
+    # Keep connections open between requests so the UI's burst of API,
+    # markdown and image fetches does not pay a TCP handshake per request.
+    # Every response therefore needs a Content-Length.
+    protocol_version = 'HTTP/1.1'
+
+    # Give up on a client that stalls in the middle of a request
+    timeout = 15
+
+    # Close keep-alive connections idle for longer than this. Kept well below
+    # timeout since an idle connection still holds a pool worker
+    keepalive_timeout = 2
+
+    # ETag of the static file being sent, added by end_headers
+    _static_etag = None
+
+    # GET endpoints mapped to their handler methods
+    _GET_ROUTES = {
+        # Team management endpoints (existing)
+        '/api/teams': 'handle_get_available_teams',
+        '/api/available-teams': 'handle_get_available_teams',
+        '/api/current-teams': 'handle_get_current_teams',
+        '/api/config': 'handle_get_config',
+        '/api/regen-status': 'handle_get_regen_status',
+        '/health': 'handle_health_check',
+    }
+
+    # Database query endpoints (new) mapped to their query type
+    _DB_ROUTES = {
+        '/api/health': 'health',
+        '/api/entities': 'entities',
+        '/api/relations': 'relations',
+        '/api/stats': 'stats',
+    }
+
+    # POST endpoints mapped to their handler methods
+    _POST_ROUTES = {
+        '/api/teams': 'handle_set_teams',
+    }
+
+    def handle(self):
+        """Handle requests until the connection is closed or goes idle."""
+        self.close_connection = False
+        while not self.close_connection and self.wait_for_request():
+            self.handle_one_request()
+
+    def wait_for_request(self):
+        """Wait for the next request on the connection, False to close it.
+
+        The wait is bounded by keepalive_timeout and ends early, giving up the
+        worker, once other connections are queued. Unlike a timeout in
+        handle_one_request it is not logged as "Request timed out".
+        """
+        deadline = time.monotonic() + self.keepalive_timeout
+        readable = False
+        self.connection.setblocking(False)
+        try:
+            while True:
+                if self.rfile.peek(1):
+                    return True
+                # Readable but nothing to read: the client closed
+                if readable:
+                    return False
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                readable = bool(select.select([self.connection], [], [], min(remaining, 0.1))[0])
+                if not readable and self.server.requests.qsize():
+                    return False
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
     
     def end_headers(self):
         """Add CORS headers to all responses."""
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        if self.request_version != 'HTTP/0.9':
+            self._headers_buffer.append(CORS_HEADERS)
+        if self._static_etag is not None:
+            self.send_header('ETag', self._static_etag)
+            self._static_etag = None
+        # Persistent connections are the default in HTTP/1.1 but have to be
+        # confirmed to HTTP/1.0 clients that asked for them
+        if not self.close_connection and self.request_version == 'HTTP/1.0':
+            self.send_header('Connection', 'keep-alive')
         super().end_headers()
     
     def do_OPTIONS(self):
         """Handle preflight OPTIONS requests."""
         self.send_response(200)
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def do_GET(self):
         """Handle GET requests including API endpoints."""
-        parsed = urlparse(self.path)
+        path, _, query = self.path.partition('?')
 
-        # Team management endpoints (existing)
-        if parsed.path == '/api/teams' or parsed.path == '/api/available-teams':
-            self.handle_get_available_teams()
-        elif parsed.path == '/api/current-teams':
-            self.handle_get_current_teams()
-        elif parsed.path == '/api/config':
-            self.handle_get_config()
-        elif parsed.path == '/health':
-            self.handle_health_check()
-        # Database query endpoints (new)
-        elif parsed.path == '/api/health':
-            self.handle_database_query('health', parsed.query)
-        elif parsed.path == '/api/entities':
-            self.handle_database_query('entities', parsed.query)
-        elif parsed.path == '/api/relations':
-            self.handle_database_query('relations', parsed.query)
-        elif parsed.path == '/api/stats':
-            self.handle_database_query('stats', parsed.query)
+        if path in self._GET_ROUTES:
+            getattr(self, self._GET_ROUTES[path])()
+        elif path in self._DB_ROUTES:
+            self.handle_database_query(self._DB_ROUTES[path], query)
         # Serve knowledge-management files from coding root
-        elif parsed.path.startswith('/knowledge-management/'):
-            self.handle_knowledge_management_file(parsed.path)
+        elif path.startswith('/knowledge-management/'):
+            self.handle_knowledge_management_file(path)
         else:
             # Serve static files
             super().do_GET()
     
+    def send_head(self):
+        """Serve static files with an ETag and answer revalidations with 304.
+
+        The ETag is derived from the file's mtime and size, so the dist/
+        bundles the UI reloads on every page view are only sent again after
+        they have been rebuilt.
+        """
+        try:
+            st = os.stat(self.translate_path(self.path))
+        except (OSError, ValueError):
+            return super().send_head()
+        if not S_ISREG(st.st_mode):
+            return super().send_head()
+
+        etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in if_none_match):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return None
+
+        self._static_etag = etag
+        return super().send_head()
+
+    def send_error(self, code, message=None, explain=None):
+        """Send an error response without the ETag of a file that failed to open."""
+        self._static_etag = None
+        super().send_error(code, message, explain)
+
+    def copyfile(self, source, outputfile):
+        """Copy a static file to the client, zero-copy when large."""
+        try:
+            file_size = os.fstat(source.fileno()).st_size
+        except (AttributeError, OSError):
+            # Directory listings are built in memory
+            super().copyfile(source, outputfile)
+            return
+        self.send_file_contents(source, file_size)
+
     def do_POST(self):
         """Handle POST requests for API endpoints."""
-        parsed = urlparse(self.path)
-        
-        if parsed.path == '/api/teams':
-            self.handle_set_teams()
+        path = self.path.partition('?')[0]
+
+        if path in self._POST_ROUTES:
+            getattr(self, self._POST_ROUTES[path])()
         else:
             self.send_error(404, "Not Found")
     
@@ -78,8 +496,7 @@ class APIHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         teams_env = os.environ.get('KNOWLEDGE_VIEW', 'coding')  # Default to coding only
 
         # Parse teams similar to VKB server
-        teams = teams_env.replace('{', '').replace('}', '').split(',')
-        teams = [t.strip() for t in teams if t.strip()]
+        teams = [team for t in teams_env.translate(_BRACE_TABLE).split(',') if (team := t.strip())]
 
         if not teams:
             teams = ['coding']  # Default to coding only
@@ -100,70 +517,69 @@ class APIHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
 
     def handle_get_available_teams(self):
         """Get list of available teams by querying GraphDB directly."""
-        # Navigate from memory-visualizer to coding root
-        coding_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        query_script = os.path.join(coding_path, 'lib', 'vkb-server', 'db-query-cli.js')
-
-        if not os.path.exists(query_script):
+        if not _QUERY_SCRIPT_AVAILABLE:
             self.send_json_response({
                 'error': 'Database query backend not available',
-                'message': f'db-query-cli.js not found at {query_script}'
+                'message': f'db-query-cli.js not found at {_QUERY_SCRIPT}'
             }, status_code=503)
             return
 
-        try:
-            # Prepare environment with correct export directory
-            query_env = os.environ.copy()
-            query_env['KNOWLEDGE_EXPORT_DIR'] = os.path.join(coding_path, '.data', 'knowledge-export')
+        signature = _export_dir_signature()
+        with _TEAMS_CACHE_LOCK:
+            if (time.monotonic() - _TEAMS_CACHE['ts'] < _TEAMS_CACHE_TTL
+                    and _TEAMS_CACHE['signature'] == signature):
+                etag, body = _TEAMS_CACHE['etag'], _TEAMS_CACHE['body']
+                compressed = _TEAMS_CACHE['compressed']
+            else:
+                etag = body = compressed = None
+        if body is not None:
+            self.send_teams_body(body, etag, compressed)
+            return
 
+        try:
             # Query GraphDB for all teams
-            result = subprocess.run(
-                ['node', query_script, 'teams', '{}'],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                cwd=coding_path,
-                env=query_env
-            )
+            result = self.run_query('teams', '{}', _CHILD_ENV)
 
             if result.returncode == 0:
                 # Parse JSON response - filter out debug/status lines
                 try:
                     # Find the JSON line (ignore logging/status lines)
-                    lines = result.stdout.strip().split('\n')
-                    json_line = None
-                    for line in lines:
-                        # Skip lines that start with special chars (✓, ⚠, [) or are empty
-                        if line and not line[0] in ['✓', '⚠', '[', ' ']:
-                            json_line = line
-                            break
+                    json_line = _find_json_line(result.stdout)
 
                     if not json_line:
                         raise ValueError("No JSON found in output")
 
-                    teams_data = json.loads(json_line)
+                    teams_data = _loads(json_line)
 
                     # Transform to expected format
                     team_info = []
                     for team in teams_data.get('available', []):
+                        display_name = team.get('displayName', team['name'].title())
                         team_info.append({
                             'name': team['name'],
-                            'displayName': team.get('displayName', team['name'].title()),
-                            'description': f"{team.get('displayName', team['name'].title())} knowledge from GraphDB",
+                            'displayName': display_name,
+                            'description': f"{display_name} knowledge from GraphDB",
                             'entities': team.get('entityCount', 0),
                             'lastActivity': team.get('lastActivity')
                         })
 
-                    self.send_json_response({'available': team_info})
+                    body = _dumps({'available': team_info})
+                    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+                    compressed = {}
+                    with _TEAMS_CACHE_LOCK:
+                        _TEAMS_CACHE.update(etag=etag, body=body, compressed=compressed,
+                                            ts=time.monotonic(), signature=signature)
+                    self.send_teams_body(body, etag, compressed)
                 except (json.JSONDecodeError, ValueError) as e:
                     print(f"Failed to parse teams response: {e}", file=sys.stderr)
-                    print(f"Output was: {result.stdout}", file=sys.stderr)
+                    output = result.stdout.decode(errors='replace')
+                    print(f"Output was: {output}", file=sys.stderr)
                     self.send_json_response({
                         'error': 'Invalid JSON response from database backend',
-                        'output': result.stdout
+                        'output': output
                     }, status_code=500)
             else:
-                error_msg = result.stderr.strip() if result.stderr else 'Unknown error'
+                error_msg = result.stderr.decode(errors='replace').strip() if result.stderr else 'Unknown error'
                 print(f"GraphDB teams query failed: {error_msg}", file=sys.stderr)
                 self.send_json_response({
                     'error': 'Failed to query teams from GraphDB',
@@ -180,13 +596,35 @@ class APIHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 'message': str(e)
             }, status_code=500)
     
+    def send_teams_body(self, body, etag, compressed):
+        """Send the team list, or 304 if the client already has this version.
+
+        Each content-coding is a different representation, so compressed
+        variants get the encoding appended to their ETag.
+        """
+        varies = len(body) >= _COMPRESS_MIN_SIZE
+        encoding = self.accepted_encoding() if varies else None
+        if encoding:
+            etag = f'{etag[:-1]}-{encoding}"'
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            if varies:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+        else:
+            self.send_json_body(body, headers={'ETag': etag}, compressed=compressed)
+
     def handle_set_teams(self):
-        """Update KNOWLEDGE_VIEW env var and reload visualization."""
-        content_length = int(self.headers.get('Content-Length', 0))
-        post_data = self.rfile.read(content_length)
+        """Update KNOWLEDGE_VIEW env var and start regenerating the visualization."""
+        global _CHILD_ENV, _REGEN_JOB, _QCACHE_BYTES
+        post_data = self.read_request_body()
+        if post_data is None:
+            return
 
         try:
-            data = json.loads(post_data)
+            data = _loads(post_data)
             teams = data.get('teams', [])
 
             if not teams:
@@ -194,92 +632,177 @@ class APIHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
 
             # Update environment variable
             teams_str = ','.join(teams)
-            os.environ['KNOWLEDGE_VIEW'] = teams_str
+            with _CHILD_ENV_LOCK:
+                os.environ['KNOWLEDGE_VIEW'] = teams_str
+                process_env = _CHILD_ENV = dict(_CHILD_ENV, KNOWLEDGE_VIEW=teams_str)
 
-            # Trigger data regeneration by deleting memory.json
-            dist_path = os.path.join(os.path.dirname(__file__), 'dist', 'memory.json')
-            if os.path.exists(dist_path):
-                os.remove(dist_path)
+            # Drop cached query results from the previous view
+            with _QCACHE_LOCK:
+                _QCACHE.clear()
+                _QCACHE_BYTES = 0
+            with _TEAMS_CACHE_LOCK:
+                _TEAMS_CACHE['ts'] = 0.0
 
             # Run data processor to regenerate with new teams
-            # Navigate from memory-visualizer to coding root
-            coding_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            vkb_cli = os.path.join(coding_path, 'bin', 'vkb-cli.js')
-            
             # Verify VKB CLI exists
-            if not os.path.exists(vkb_cli):
+            if not _VKB_CLI_AVAILABLE:
                 self.send_json_response({
                     'success': False,
-                    'error': f'VKB CLI not found at {vkb_cli}'
+                    'error': f'VKB CLI not found at {_VKB_CLI}'
                 }, status_code=500)
                 return
             
-            # Prepare environment with updated KNOWLEDGE_VIEW
-            process_env = os.environ.copy()
-            process_env['KNOWLEDGE_VIEW'] = teams_str
             print(f"Setting KNOWLEDGE_VIEW to: {teams_str}", file=sys.stderr)
-            
+
+            # Start the vkb data processor in the background; clients poll
+            # /api/regen-status instead of waiting for it to finish. Repeated
+            # requests for the same teams share the running regeneration.
             try:
-                # Call vkb data processor with timeout and better error handling
-                result = subprocess.run(
-                    ['node', vkb_cli, 'data', 'process'],
-                    capture_output=True,
-                    text=True,
-                    env=process_env,
-                    timeout=30,  # 30 second timeout
-                    cwd=coding_path
-                )
-                
-                if result.returncode == 0:
-                    self.send_json_response({
-                        'success': True,
-                        'teams': teams,
-                        'message': f'Switched to teams: {teams_str}'
-                    })
-                else:
-                    error_msg = result.stderr.strip() if result.stderr else 'Unknown error'
-                    print(f"VKB CLI error (code {result.returncode}): {error_msg}", file=sys.stderr)
-                    print(f"VKB CLI stdout: {result.stdout}", file=sys.stderr)
-                    self.send_json_response({
-                        'success': False,
-                        'error': f'Data processing failed: {error_msg}'
-                    }, status_code=500)
-            except subprocess.TimeoutExpired:
-                self.send_json_response({
-                    'success': False,
-                    'error': 'Data processing timed out after 30 seconds'
-                }, status_code=500)
+                with _REGEN_LOCK:
+                    job = _REGEN_JOB
+                    if job is None or job['status'] != 'regenerating' or job['teams'] != teams_str:
+                        previous, _REGEN_JOB = job, _start_regen_job(teams_str, process_env)
+                        # A regeneration for the previous selection is now outdated
+                        if previous is not None and previous['status'] == 'regenerating':
+                            previous['status'] = 'cancelled'
+                            previous['proc'].kill()
             except Exception as subprocess_error:
                 self.send_json_response({
                     'success': False,
                     'error': f'Subprocess error: {str(subprocess_error)}'
                 }, status_code=500)
-                
+                return
+
+            self.send_json_response({
+                'success': True,
+                'teams': teams,
+                'status': 'regenerating',
+                'message': f'Switching to teams: {teams_str}'
+            })
+
         except Exception as e:
             self.send_json_response({
                 'success': False,
                 'error': str(e)
             }, status_code=500)
     
+    def handle_get_regen_status(self):
+        """Report the state of the most recent data regeneration."""
+        with _REGEN_LOCK:
+            job = _REGEN_JOB
+            if job is None:
+                status = {'status': 'idle'}
+            else:
+                status = {
+                    'status': job['status'],
+                    'teams': job['teams'],
+                    'started': job['started'],
+                    'returncode': job.get('returncode'),
+                    'error': job.get('error')
+                }
+        self.send_json_response(status)
+
+    def read_request_body(self):
+        """Read the request body into a buffer of its declared length.
+
+        Returns None after sending an error response if the Content-Length is
+        missing, invalid or larger than _MAX_REQUEST_BODY. Chunked bodies are
+        not supported.
+        """
+        content_length = self.headers.get('Content-Length')
+        if content_length is None or 'Transfer-Encoding' in self.headers:
+            content_length = None
+        else:
+            try:
+                content_length = int(content_length)
+            except ValueError:
+                content_length = -1
+
+        if content_length is None or not 0 <= content_length <= _MAX_REQUEST_BODY:
+            if content_length is None:
+                status_code, error = 411, 'Content-Length required'
+            elif content_length < 0:
+                status_code, error = 400, 'Invalid Content-Length'
+            else:
+                status_code, error = 413, f'Request body larger than {_MAX_REQUEST_BODY} bytes'
+            # The body is left unread, so the connection cannot be reused
+            self.send_json_body(_dumps({'success': False, 'error': error}), status_code,
+                                headers={'Connection': 'close'})
+            return None
+
+        body = bytearray(content_length)
+        received = 0
+        with memoryview(body) as view:
+            while received < content_length:
+                count = self.rfile.readinto(view[received:])
+                if not count:
+                    break
+                received += count
+        del body[received:]
+        return body
+
     def send_json_response(self, data, status_code=200):
         """Send a JSON response."""
-        response = json.dumps(data)
+        self.send_json_body(_dumps(data), status_code)
+
+    def send_json_body(self, response, status_code=200, headers=None, compressed=None):
+        """Send an already serialized JSON response body.
+
+        compressed is an optional dict in which the compressed variants of a
+        cached body are kept, so each is only compressed once.
+        """
+        # Bodies below the size threshold are never compressed, so only
+        # larger ones vary with Accept-Encoding
+        varies = len(response) >= _COMPRESS_MIN_SIZE
+        response, encoding = self.compress_body(response, compressed)
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Content-Length', str(len(response)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if varies:
+            self.send_header('Vary', 'Accept-Encoding')
+        if headers:
+            for name, value in headers.items():
+                self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(response.encode())
+        self.wfile.write(response)
+
+    def compress_body(self, body, compressed=None):
+        """Compress a response body if the client accepts zstd or gzip.
+
+        Returns the (possibly compressed) body and its Content-Encoding, or
+        None if the body is sent as is. Results are looked up in and added to
+        the compressed dict when one is given.
+        """
+        if len(body) < _COMPRESS_MIN_SIZE:
+            return body, None
+        encoding = self.accepted_encoding()
+        if encoding is None:
+            return body, None
+
+        if compressed is not None and encoding in compressed:
+            return compressed[encoding], encoding
+        result = _compress(body, encoding)
+        if compressed is not None:
+            compressed[encoding] = result
+        return result, encoding
+
+    def accepted_encoding(self):
+        """Return the Content-Encoding to compress the response with, or None."""
+        accept_encoding = self.headers.get('Accept-Encoding', '')
+        if zstandard is not None and 'zstd' in accept_encoding:
+            return 'zstd'
+        if 'gzip' in accept_encoding:
+            return 'gzip'
+        return None
     
     def handle_database_query(self, query_type, query_params):
         """Proxy database queries to Node.js backend."""
-        # Navigate from memory-visualizer to coding root
-        coding_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        query_script = os.path.join(coding_path, 'lib', 'vkb-server', 'db-query-cli.js')
-
-        if not os.path.exists(query_script):
+        if not _QUERY_SCRIPT_AVAILABLE:
             self.send_json_response({
                 'error': 'Database query backend not available',
-                'message': f'db-query-cli.js not found at {query_script}'
+                'message': f'db-query-cli.js not found at {_QUERY_SCRIPT}'
             }, status_code=503)
             return
 
@@ -289,47 +812,57 @@ class APIHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
 
             # Convert to JSON for CLI
             params_json = {k: v[0] if len(v) == 1 else v for k, v in params.items()}
+            params_arg = _dumps(params_json).decode()
 
-            # Prepare environment with correct export directory
-            query_env = os.environ.copy()
-            query_env['KNOWLEDGE_EXPORT_DIR'] = os.path.join(coding_path, '.data', 'knowledge-export')
+            # One snapshot of the environment, so the result is cached under
+            # the view it was actually queried with even if the teams change
+            env = _CHILD_ENV
+
+            # Serve repeated queries from the cache. Health checks always go
+            # to the backend so connection problems show up immediately.
+            cache_key = None
+            if query_type != 'health':
+                cache_key = (query_type, params_arg, env.get('KNOWLEDGE_VIEW', ''))
+                with _QCACHE_LOCK:
+                    cached = _QCACHE.get(cache_key)
+                    if cached and time.monotonic() - cached[0] < _QCACHE_TTL:
+                        _QCACHE.move_to_end(cache_key)
+                        response_body, compressed = cached[1], cached[2]
+                    else:
+                        response_body = None
+                if response_body is not None:
+                    self.send_json_body(response_body, compressed=compressed)
+                    return
 
-            # Call Node.js CLI with query type and params
-            result = subprocess.run(
-                ['node', query_script, query_type, json.dumps(params_json)],
-                capture_output=True,
-                text=True,
-                timeout=10,  # 10 second timeout
-                cwd=coding_path,
-                env=query_env
-            )
+            # Call Node.js backend with query type and params
+            result = self.run_query(query_type, params_arg, env)
 
             if result.returncode == 0:
                 # Parse and return JSON response
                 # Filter out debug/status lines (✓, ⚠, [, whitespace)
                 try:
                     # Find the JSON line (ignore logging/status lines)
-                    lines = result.stdout.strip().split('\n')
-                    json_line = None
-                    for line in lines:
-                        # Skip lines that start with special chars (✓, ⚠, [) or are empty
-                        if line and not line[0] in ['✓', '⚠', '[', ' ']:
-                            json_line = line
-                            break
+                    json_line = _find_json_line(result.stdout)
 
                     if json_line:
-                        response_data = json.loads(json_line)
-                        self.send_json_response(response_data)
+                        # Validate the backend's JSON but forward its bytes as is
+                        _loads(json_line)
+                        response_body = json_line
+                        compressed = {}
+                        if cache_key is not None and len(response_body) <= _QCACHE_MAX_ENTRY:
+                            with _QCACHE_LOCK:
+                                _qcache_put(cache_key, response_body, compressed)
+                        self.send_json_body(response_body, compressed=compressed)
                     else:
-                        raise json.JSONDecodeError("No JSON found", result.stdout, 0)
+                        raise json.JSONDecodeError("No JSON found", '', 0)
                 except json.JSONDecodeError as e:
                     self.send_json_response({
                         'error': 'Invalid JSON response from database backend',
-                        'output': result.stdout,
+                        'output': result.stdout.decode(errors='replace'),
                         'parseError': str(e)
                     }, status_code=500)
             else:
-                error_msg = result.stderr.strip() if result.stderr else 'Unknown error'
+                error_msg = result.stderr.decode(errors='replace').strip() if result.stderr else 'Unknown error'
                 self.send_json_response({
                     'error': 'Database query failed',
                     'message': error_msg
@@ -345,18 +878,56 @@ class APIHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 'message': str(e)
             }, status_code=500)
 
+    def run_query(self, query_type, params_arg, env):
+        """Run a database query, sharing the result of an identical running one."""
+        key = (query_type, params_arg, env.get('KNOWLEDGE_VIEW'))
+        with _INFLIGHT_LOCK:
+            future = _INFLIGHT.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = _INFLIGHT[key] = concurrent.futures.Future()
+
+        if not is_leader:
+            try:
+                return future.result(timeout=10)
+            except concurrent.futures.TimeoutError:
+                # Not the builtin TimeoutError before Python 3.11
+                raise subprocess.TimeoutExpired(['node', _QUERY_SCRIPT, query_type, params_arg], 10)
+
+        try:
+            result = self.execute_query(query_type, params_arg, env)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with _INFLIGHT_LOCK:
+                del _INFLIGHT[key]
+
+    def execute_query(self, query_type, params_arg, env):
+        """Run a database query with db-query-cli.js."""
+        return subprocess.run(
+            ['node', _QUERY_SCRIPT, query_type, params_arg],
+            capture_output=True,
+            timeout=10,  # 10 second timeout
+            cwd=_CODING_PATH,
+            env=env
+        )
+
     def handle_knowledge_management_file(self, path):
         """Serve files from the knowledge-management directory in coding root."""
-        # Navigate from memory-visualizer to coding root
-        coding_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
         # Remove leading slash and construct full path
         relative_path = path.lstrip('/')
-        full_path = os.path.join(coding_path, relative_path)
+        full_path = os.path.normpath(os.path.join(_CODING_PATH, relative_path))
 
-        # Security: Ensure the path stays within coding directory
-        full_path = os.path.realpath(full_path)
-        if not full_path.startswith(os.path.realpath(coding_path)):
+        # Security: Ensure the path stays within coding directory. Normalizing
+        # the joined path rejects '..' escapes without touching the
+        # filesystem; resolving it catches symlinks, including symlinked
+        # directories, that point outside.
+        if (not full_path.startswith(_CODING_PATH_PREFIX)
+                or not os.path.realpath(full_path).startswith(_CODING_PATH_REAL_PREFIX)):
             self.send_error(403, "Forbidden: Path traversal detected")
             return
 
@@ -366,82 +937,75 @@ class APIHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             return
 
         # Determine content type
-        content_type = 'text/plain'
-        if full_path.endswith('.md'):
-            content_type = 'text/markdown; charset=utf-8'
-        elif full_path.endswith('.png'):
-            content_type = 'image/png'
-        elif full_path.endswith('.jpg') or full_path.endswith('.jpeg'):
-            content_type = 'image/jpeg'
-        elif full_path.endswith('.svg'):
-            content_type = 'image/svg+xml'
-        elif full_path.endswith('.json'):
-            content_type = 'application/json'
-        elif full_path.endswith('.puml'):
-            content_type = 'text/plain; charset=utf-8'
+        ext = os.path.splitext(full_path)[1].lower()
+        content_type = _CONTENT_TYPES.get(ext, 'text/plain')
 
         try:
-            # Read and serve the file
-            mode = 'rb' if content_type.startswith('image/') else 'r'
-            with open(full_path, mode) as f:
-                content = f.read()
+            f = open(full_path, 'rb')
+            file_size = os.fstat(f.fileno()).st_size
+        except Exception as e:
+            self.send_error(500, f"Error reading file: {str(e)}")
+            return
 
-            if isinstance(content, str):
-                content = content.encode('utf-8')
+        with f:
+            # Text content is compressed when the client supports it, images
+            # and very large files are streamed as is. The file is only read
+            # into memory when it is actually going to be compressed.
+            compressible = (content_type.startswith(_COMPRESSIBLE_TYPES)
+                            and _COMPRESS_MIN_SIZE <= file_size <= _COMPRESS_MAX_SIZE)
+            encoding = self.accepted_encoding() if compressible else None
+            if encoding:
+                content = _compress(f.read(), encoding)
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(content)))
+                self.send_header('Content-Encoding', encoding)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
+                self.wfile.write(content)
+                return
 
             self.send_response(200)
             self.send_header('Content-Type', content_type)
-            self.send_header('Content-Length', str(len(content)))
+            self.send_header('Content-Length', str(file_size))
+            if compressible:
+                self.send_header('Vary', 'Accept-Encoding')
             self.end_headers()
-            self.wfile.write(content)
-        except Exception as e:
-            self.send_error(500, f"Error reading file: {str(e)}")
+            self.send_file_contents(f, file_size)
+
+    def send_file_contents(self, f, file_size):
+        """Write an open binary file to the client, zero-copy when large."""
+        if file_size < _SENDFILE_MIN_SIZE:
+            self.wfile.write(f.read())
+        else:
+            self.wfile.flush()
+            self.connection.sendfile(f, 0, file_size)
 
     def handle_health_check(self):
         """Handle health check endpoint for monitoring."""
-        import time
-        
-        # Try to import psutil, but don't fail if it's not available
-        try:
-            import psutil
-            psutil_available = True
-        except ImportError:
-            psutil_available = False
-        
         # Get basic system info
         health_info = {
             'status': 'healthy',
             'timestamp': time.time(),
             'server': {
-                'port': int(os.environ.get('PORT', 8080)),
-                'pid': os.getpid(),
-                'uptime': time.time() - getattr(self.server, 'start_time', time.time())
+                'port': self.server.port,
+                'pid': self.server.pid,
+                'uptime': time.time() - self.server.start_time
             },
-            'system': {
-                'cpu_percent': psutil.cpu_percent() if psutil_available else 0,
-                'memory_percent': psutil.virtual_memory().percent if psutil_available else 0
-            }
+            'system': dict(_SYSTEM_STATS)
         }
         
         # Check knowledge base files
         kb_path = os.environ.get('CODING_KB_PATH')
-        if not kb_path:
-            kb_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        if kb_path:
+            knowledge_export_path = os.path.join(kb_path, '.data', 'knowledge-export')
+        else:
+            kb_path = _DEFAULT_KB_PATH
+            knowledge_export_path = _KNOWLEDGE_EXPORT_DIR
         
-        kb_files = []
-        knowledge_export_path = os.path.join(kb_path, '.data', 'knowledge-export')
-        try:
-            for filename in os.listdir(knowledge_export_path):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(knowledge_export_path, filename)
-                    if os.path.exists(filepath):
-                        kb_files.append({
-                            'name': filename,
-                            'size': os.path.getsize(filepath),
-                            'last_modified': os.path.getmtime(filepath)
-                        })
-        except Exception as e:
-            health_info['warning'] = f'Could not check knowledge base files: {str(e)}'
+        kb_files, error = _get_kb_files(knowledge_export_path)
+        if error:
+            health_info['warning'] = f'Could not check knowledge base files: {error}'
         
         health_info['knowledge_base'] = {
             'path': kb_path,
@@ -452,8 +1016,7 @@ class APIHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     
     def log_message(self, format, *args):
         """Override to provide cleaner log messages."""
-        import datetime
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = time.strftime(LOG_TIME_FORMAT)
         sys.stderr.write(f"{timestamp} - {format % args}\n")
 
 
@@ -466,12 +1029,24 @@ def main():
     if directory != '.':
         os.chdir(directory)
     
-    # Create server with SO_REUSEADDR option
+    # Create server with SO_REUSEADDR option. Connections are handled by a
+    # bounded thread pool so a slow GraphDB query or data regeneration does
+    # not block static files and other API calls, while a burst of requests
+    # queues for a worker instead of spawning unbounded threads. Threads
+    # rather than forked workers: the selected teams (KNOWLEDGE_VIEW), the
+    # in-flight queries and the response caches are process state that every
+    # request must share, and the handlers spend their time waiting on
+    # Node.js, not holding the GIL.
     try:
-        class ReuseAddrTCPServer(socketserver.TCPServer):
-            allow_reuse_address = True
-        
         with ReuseAddrTCPServer(("", port), APIHTTPRequestHandler) as httpd:
+            # Reported by /health
+            httpd.start_time = time.time()
+            httpd.pid = os.getpid()
+            httpd.port = port
+
+            if psutil is not None:
+                threading.Thread(target=_sample_system_stats, daemon=True).start()
+
             print(f"Serving HTTP with API on port {port} from directory '{os.getcwd()}'")
             print(f"Server URL: http://localhost:{port}")
             print("API endpoints:")
@@ -479,6 +1054,13 @@ def main():
             print("  GET  /api/current-teams - Get current KNOWLEDGE_VIEW setting")
             print("  GET  /api/available-teams - List available team files")
             print("  POST /api/teams - Update team selection")
+            print("  GET  /api/regen-status - Progress of the data regeneration after a team change")
+            if not _QUERY_SCRIPT_AVAILABLE:
+                print(f"Warning: db-query-cli.js not found at {_QUERY_SCRIPT}, "
+                      "database endpoints will return 503")
+            if not _VKB_CLI_AVAILABLE:
+                print(f"Warning: vkb-cli.js not found at {_VKB_CLI}, "
+                      "team changes will not regenerate the visualization")
             try:
                 httpd.serve_forever()
             except KeyboardInterrupt:
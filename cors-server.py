@@ -5,32 +5,43 @@ This server allows cross-origin requests needed for the knowledge base viewer.
 """
 
 import http.server
-import socketserver
 import sys
 import os
+import time
 from urllib.parse import unquote
 
+from server_common import CORS_HEADERS, LOG_TIME_FORMAT, ReuseAddrTCPServer
+
 
 class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """HTTP request handler with CORS support."""
     
     def end_headers(self):
         """Add CORS headers to all responses."""
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        if self.request_version != 'HTTP/0.9':
+            self._headers_buffer.append(CORS_HEADERS)
         super().end_headers()
     
     def do_OPTIONS(self):
         """Handle preflight OPTIONS requests."""
         self.send_response(200)
         self.end_headers()
+
+    def copyfile(self, source, outputfile):
+        """Copy a file to the client with sendfile() instead of read/write."""
+        try:
+            source.fileno()
+        except (AttributeError, OSError):
+            # Directory listings are built in memory
+            super().copyfile(source, outputfile)
+            return
+        outputfile.flush()
+        self.connection.sendfile(source)
     
     def log_message(self, format, *args):
         """Override to provide cleaner log messages."""
         # Add timestamp to log messages
-        import datetime
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = time.strftime(LOG_TIME_FORMAT)
         sys.stderr.write(f"{timestamp} - {format % args}\n")
 
 
@@ -45,10 +56,6 @@ def main():
     
     # Create server with SO_REUSEADDR option
     try:
-        # Create a custom server class with address reuse enabled
-        class ReuseAddrTCPServer(socketserver.TCPServer):
-            allow_reuse_address = True
-        
         with ReuseAddrTCPServer(("", port), CORSHTTPRequestHandler) as httpd:
             print(f"Serving HTTP on port {port} from directory '{os.getcwd()}'")
             print(f"Server URL: http://localhost:{port}")
@@ -0,0 +1,82 @@
+"""
+Shared pieces of the memory visualizer's HTTP servers (api-server.py and
+cors-server.py), which run from this directory.
+"""
+
+import queue
+import socketserver
+import threading
+
+# Timestamp format of the request log lines
+LOG_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# CORS headers added to every response, preformatted so end_headers does not
+# go through send_header for each of them
+CORS_HEADERS = (b'Access-Control-Allow-Origin: *\r\n'
+                b'Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n'
+                b'Access-Control-Allow-Headers: Content-Type\r\n')
+
+
+class ThreadPoolingMixIn:
+    """Mix-in class to handle each connection on a pool of worker threads.
+
+    The pool starts with min_workers threads and grows, up to max_workers,
+    whenever fewer than min_spare_workers are idle. Beyond that, accepted
+    connections wait in a queue instead of each spawning a new thread. The
+    workers are daemon threads so stopping the server never waits for them.
+    """
+
+    def init_thread_pool(self, min_workers=8, max_workers=64, min_spare_workers=4):
+        """Start the worker threads; call once before serve_forever()."""
+        self.requests = queue.Queue()
+        self.workers_mutex = threading.Lock()
+        self.max_workers = max_workers
+        self.min_spare_workers = min_spare_workers
+        self.workers = 0
+        self.idle_workers = 0
+        with self.workers_mutex:
+            self.start_workers(min_workers)
+
+    def start_workers(self, count):
+        """Start up to count more workers; called with workers_mutex held."""
+        count = min(count, self.max_workers - self.workers)
+        for _ in range(count):
+            self.workers += 1
+            self.idle_workers += 1
+            threading.Thread(target=self.process_request_worker, daemon=True).start()
+
+    def process_request(self, request, client_address):
+        """Queue the connection for a worker, growing the pool if needed."""
+        self.requests.put((request, client_address))
+        with self.workers_mutex:
+            spare = self.idle_workers - self.requests.qsize()
+            if spare < self.min_spare_workers:
+                self.start_workers(self.min_spare_workers - spare)
+
+    def process_request_worker(self):
+        """Handle queued connections forever."""
+        while True:
+            request, client_address = self.requests.get()
+            with self.workers_mutex:
+                self.idle_workers -= 1
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self.workers_mutex:
+                    self.idle_workers += 1
+
+
+class ReuseAddrTCPServer(ThreadPoolingMixIn, socketserver.TCPServer):
+    """TCP server with address reuse enabled that serves connections from a
+    pool of worker threads, started with the default pool size."""
+
+    allow_reuse_address = True
+    # The default backlog of 5 refuses connections under bursts
+    request_queue_size = 128
+
+    def __init__(self, server_address, RequestHandlerClass, bind_and_activate=True):
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+        self.init_thread_pool()